@@ -0,0 +1,174 @@
+"""
+Pydantic models for the financial use cases test suite (financial_test.py)
+
+Kept in their own module so they can be imported by other tools without
+pulling in the test client.
+"""
+
+from typing import List, Optional, Literal
+
+from pydantic import BaseModel, Field, model_validator, ConfigDict
+from pydantic.types import PositiveFloat
+
+
+# =============================================================================
+# FINANCIAL DATA MODELS (Pydantic)
+# =============================================================================
+
+# Plain Literal types: validated with a simple membership check, and the
+# fields hold the string itself (no Enum instance per value)
+Currency = Literal["USD", "EUR", "GBP", "JPY", "CHF"]
+
+AssetClass = Literal["equity", "fixed_income", "commodity", "forex", "derivative", "cryptocurrency"]
+
+TransactionType = Literal["buy", "sell", "transfer", "dividend", "interest"]
+
+RiskLevel = Literal["low", "medium", "high", "very_high"]
+
+# Tickers and identifiers are bounded so the guided-decoding grammar doesn't
+# have to allow arbitrary JSON strings (escapes and all) for them
+SYMBOL_PATTERN = r"^[A-Z][A-Z0-9.\-]{0,9}$"  # AAPL, BRK.B, BTC-USD
+ID_MAX_LENGTH = 32
+
+
+class Transaction(BaseModel):
+    """Single financial transaction with automatic validation"""
+    model_config = ConfigDict(
+        str_strip_whitespace=True,
+        validate_default=True,  # fees has a default
+        extra='forbid',
+        frozen=True
+    )
+    
+    transaction_id: str = Field(max_length=ID_MAX_LENGTH, description="Unique transaction identifier")
+    timestamp: str = Field(description="ISO 8601 timestamp")
+    transaction_type: TransactionType
+    asset_symbol: str = Field(pattern=SYMBOL_PATTERN, max_length=10, description="Stock ticker or asset symbol")
+    quantity: PositiveFloat = Field(description="Number of shares/units")
+    price_per_unit: PositiveFloat = Field(description="Price per share/unit")
+    total_amount: float = Field(description="Total transaction amount")
+    currency: Currency
+    fees: float = Field(default=0.0, ge=0)
+    
+    @model_validator(mode='after')
+    def validate_total(self) -> 'Transaction':
+        """Validate total amount matches quantity × price"""
+        # Runs on the built model, so fields are plain attribute reads
+        expected = self.quantity * self.price_per_unit
+        if abs(self.total_amount - expected) > 0.01:  # Allow small rounding differences
+            raise ValueError(f"Total amount mismatch: {self.total_amount:.2f} != {expected:.2f}")
+        return self
+
+
+class PortfolioHolding(BaseModel):
+    """Portfolio holding with valuation"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    asset_symbol: str = Field(pattern=SYMBOL_PATTERN, max_length=10)
+    asset_name: str = Field(min_length=1)
+    asset_class: AssetClass
+    quantity: PositiveFloat
+    current_price: PositiveFloat
+    market_value: PositiveFloat
+    cost_basis: float = Field(ge=0, description="Cost basis (can be 0 for gifts/transfers)")
+    unrealized_gain_loss: float
+    percentage_of_portfolio: float = Field(ge=0, le=100)
+    currency: Currency
+
+
+class Portfolio(BaseModel):
+    """Complete portfolio with holdings"""
+    model_config = ConfigDict(
+        extra='forbid',
+        str_strip_whitespace=True,
+        frozen=True
+    )
+    
+    portfolio_id: str = Field(min_length=1, max_length=ID_MAX_LENGTH, description="Unique portfolio identifier")
+    account_holder: str = Field(min_length=1, description="Account holder name")
+    total_value: PositiveFloat = Field(description="Total portfolio value")
+    currency: Currency
+    holdings: List[PortfolioHolding] = Field(min_length=0, description="List of holdings")
+    cash_balance: float = Field(ge=0, description="Available cash")
+    last_updated: str = Field(description="ISO 8601 timestamp")
+
+
+class MarketData(BaseModel):
+    """Real-time market data"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    symbol: str = Field(pattern=SYMBOL_PATTERN, max_length=10)
+    exchange: str = Field(min_length=1)
+    last_price: PositiveFloat
+    bid_price: Optional[PositiveFloat] = None
+    ask_price: Optional[PositiveFloat] = None
+    volume: int = Field(ge=0)
+    day_high: PositiveFloat
+    day_low: PositiveFloat
+    day_open: PositiveFloat
+    previous_close: PositiveFloat
+    change_percent: float
+    timestamp: str = Field(description="ISO 8601 timestamp")
+
+
+class RiskAnalysis(BaseModel):
+    """Portfolio risk analysis with comprehensive metrics"""
+    model_config = ConfigDict(
+        extra='forbid',
+        str_strip_whitespace=True,
+        frozen=True
+    )
+    
+    portfolio_id: str = Field(min_length=1, max_length=ID_MAX_LENGTH, description="Portfolio identifier")
+    overall_risk_level: RiskLevel
+    volatility: float = Field(ge=0, le=100, description="Annualized volatility %")
+    sharpe_ratio: float = Field(ge=-10, le=10, description="Risk-adjusted return metric")
+    max_drawdown: float = Field(ge=0, le=100, description="Maximum drawdown %")
+    beta: float = Field(ge=-5, le=5, description="Market correlation coefficient")
+    var_95: float = Field(description="Value at Risk (95% confidence)")
+    diversification_score: float = Field(ge=0, le=100, description="Diversification score 0-100")
+    recommendations: List[str] = Field(min_length=1, description="Risk mitigation recommendations")
+
+
+class TradeSignal(BaseModel):
+    """Algorithmic trading signal with validation"""
+    model_config = ConfigDict(
+        extra='forbid',
+        str_strip_whitespace=True,
+        frozen=True
+    )
+    
+    signal_id: str = Field(min_length=1, max_length=ID_MAX_LENGTH, description="Unique signal identifier")
+    timestamp: str = Field(description="ISO 8601 timestamp")
+    symbol: str = Field(pattern=SYMBOL_PATTERN, max_length=10, description="Asset symbol")
+    action: Literal["BUY", "SELL", "HOLD"]
+    confidence: float = Field(ge=0, le=100, description="Confidence level 0-100%")
+    target_price: PositiveFloat = Field(description="Target price")
+    stop_loss: PositiveFloat = Field(description="Stop loss price")
+    take_profit: PositiveFloat = Field(description="Take profit price")
+    timeframe: Literal["short_term", "medium_term", "long_term"]
+    indicators: List[str] = Field(min_length=1, description="Technical indicators used")
+    rationale: str = Field(min_length=10, description="Reason for the signal")
+
+
+class FinancialStatement(BaseModel):
+    """Company financial statement with comprehensive data"""
+    model_config = ConfigDict(
+        extra='forbid',
+        str_strip_whitespace=True,
+        frozen=True
+    )
+    
+    company_name: str = Field(min_length=1, description="Company legal name")
+    ticker: str = Field(pattern=SYMBOL_PATTERN, max_length=10, description="Stock ticker symbol")
+    period: str = Field(min_length=1, description="e.g., Q4 2024, FY 2023")
+    currency: Currency
+    revenue: PositiveFloat = Field(description="Total revenue")
+    operating_income: float = Field(description="Operating income (can be negative)")
+    net_income: float = Field(description="Net income (can be negative)")
+    earnings_per_share: float = Field(description="EPS (diluted)")
+    total_assets: PositiveFloat = Field(description="Total assets")
+    total_liabilities: float = Field(ge=0, description="Total liabilities")
+    shareholders_equity: float = Field(description="Shareholders equity")
+    operating_cash_flow: float = Field(description="Operating cash flow")
+    free_cash_flow: float = Field(description="Free cash flow")